@@ -1,23 +1,22 @@
 from ninja import NinjaAPI, Schema
 from pydantic import field_validator
 import re
+import operator
 from .models import User, CourseMember, CourseContent,Comment,Course
 from typing import List
 
 apiv1 = NinjaAPI(version="1.0.0")
 
+_OPS = {'+': operator.add, '-': operator.sub, 'x': operator.mul}
+_PW_RE = re.compile(r'^(?=.*[A-Za-z])(?=.*\d).+$')
+
 @apiv1.get('/hello')
 def helloApi(request):
     return "Menyala abangkuh ..."
 
 @apiv1.get('calc/{nil1}/{opr}/{nil2}')
 def calculator(request, nil1:int, opr:str, nil2:int):
-    hasil = nil1 + nil2
-    if opr == '-':
-        hasil = nil1 - nil2
-    elif opr == 'x':
-        hasil = nil1 * nil2
-    
+    hasil = _OPS.get(opr, operator.add)(nil1, nil2)
     return {'nilai1': nil1, 'nilai2': nil2, 'operator': opr, 'hasil': hasil}
 
 @apiv1.post('hello/')
@@ -41,18 +40,13 @@ class Kalkulator(Schema):
     hasil: int = 0
 
     def calcHasil(self):
-        hasil = self.nil1 + self.nil2
-        if self.opr == '-':
-            hasil = self.nil1 - self.nil2
-        elif self.opr == 'x':
-            hasil = self.nil1 * self.nil2
-        
+        hasil = _OPS.get(self.opr, operator.add)(self.nil1, self.nil2)
         return {'nilai1': self.nil1, 'nilai2': self.nil2, 
-                'operator': self.opr, 'hasil': self.hasil}
+                'operator': self.opr, 'hasil': hasil}
 
 @apiv1.post('calc')
 def postCalc(request, skim : Kalkulator):
-    skim.hasil = skim.calcHasil()
+    skim.hasil = skim.calcHasil()['hasil']
     return skim
 
 class Register(Schema):
@@ -62,6 +56,21 @@ class Register(Schema):
     first_name: str
     last_name: str
 
+    @field_validator("username")
+    def validate_username(cls, value):
+        if len(value) < 5:
+            raise ValueError("Username harus lebih dari 3 karakter")
+        return value
+
+    @field_validator('password')
+    def validate_password(cls, value):
+        if len(value) < 8:
+            raise ValueError("Password harus lebih dari 8 karakter")
+        
+        if not _PW_RE.match(value):
+            raise ValueError("Password harus mengandung huruf dan angka")
+        return value
+
 class UserOut(Schema):
     id: int
     username: str
@@ -78,21 +87,6 @@ def register(request, data:Register):
                                 last_name=data.last_name)
     return newUser
 
-    @field_validator("username")
-    def validate_username(cls, value):
-        if len(value) < 5:
-            raise ValueError("Username harus lebih dari 3 karakter")
-        return value
-
-    @field_validator('password')
-    def validate_password(cls, value):
-        if len(value) < 8:
-            raise ValueError("Password harus lebih dari 8 karakter")
-        
-        pattern = r'^(?=.[A-Za-z])(?=.\d).+$'
-        if not re.match(pattern, value):
-            raise ValueError("Password harus mengandung huruf dan angka")
-
 class UserSchema(Schema):
     id: int
     username: str
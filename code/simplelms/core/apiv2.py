@@ -1,74 +1,180 @@
+import base64
+import json
 import jwt
-import datetime
-import os
-import re  # Wajib import re
+import hashlib
+import logging
+import time
+from datetime import timedelta
+from functools import wraps
+from pathlib import Path
 from typing import Any, List, Optional
-from ninja import NinjaAPI, Schema, Query
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from ninja import NinjaAPI, Schema, Query, Field
 from ninja.pagination import PaginationBase, paginate
 from ninja.security import HttpBearer
 from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Subquery
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import parse_etags
 from ninja.errors import HttpError
-from .models import User, Course, CourseMember, CourseContent, Comment
+from .models import User, Course, CourseMember, Comment
 from .throttling import SimpleRateThrottle
+from .renderers import ORJSONRenderer
+from .signals import AUTH_USER_CACHE_TTL, auth_user_cache_key, COURSE_STATE_CACHE_KEY, COURSE_STATE_CACHE_TTL
 from .apiv2_schemas import CourseSchema, CourseMemberOut
 
+log = logging.getLogger(__name__)
+
 # ==========================================
 # 1. LOGIC AUTHENTICATION (SINKRON & AMAN)
 # ==========================================
 
-def get_rsa_keys():
+# Path key dihitung sekali (BASE_DIR sudah berupa pathlib.Path)
+_PRIV_PATH = Path(settings.BASE_DIR) / 'jwt-signing.pem'
+_PUB_PATH = Path(settings.BASE_DIR) / 'jwt-signing.pub'
+
+def _load_rsa_keys():
     """
-    Mencoba load RSA Keys.
+    Mencoba load RSA Keys dari disk (dipanggil sekali saat import).
     Return: (private_key, public_key)
     """
     priv, pub = None, None
     try:
-        # Coba cari path kunci
-        priv_path = os.path.join(settings.BASE_DIR, 'jwt-signing.pem')
-        pub_path = os.path.join(settings.BASE_DIR, 'jwt-signing.pub')
-        
         # Baca Private Key
-        if os.path.exists(priv_path):
-            with open(priv_path, 'rb') as f: priv = f.read()
+        if _PRIV_PATH.is_file():
+            priv = _PRIV_PATH.read_bytes()
             
         # Baca Public Key
-        if os.path.exists(pub_path):
-            with open(pub_path, 'rb') as f: pub = f.read()
+        if _PUB_PATH.is_file():
+            pub = _PUB_PATH.read_bytes()
             
     except Exception as e:
-        print(f"[KEY LOAD ERROR] {e}")
+        log.warning("[KEY LOAD ERROR] %s", e)
         
     return priv, pub
 
-class CustomJwtAuth(HttpBearer):
-    def authenticate(self, request, token):
-        # 1. Bersihkan Header "Bearer "
-        # Regex ini menghapus "Bearer" (besar/kecil) dan spasi
-        token = re.sub(r'^bearer\s+', '', token, flags=re.IGNORECASE).strip()
+def _prepare_rsa_keys(priv, pub):
+    """
+    Parse PEM jadi key object cryptography sekali saja,
+    supaya PyJWT tidak decode PEM ulang di setiap encode/decode.
+    """
+    try:
+        if priv: priv = serialization.load_pem_private_key(priv, password=None)
+        if pub: pub = serialization.load_pem_public_key(pub)
+    except Exception as e:
+        log.warning("[KEY PARSE ERROR] %s", e)
+        priv, pub = None, None
+    return priv, pub
 
-        # 2. Siapkan Kandidat Key
-        _, pub_key = get_rsa_keys()
-        
-        candidates = []
-        # Prioritas 1: RSA (Hanya jika Public Key benar-benar ada)
-        if pub_key: 
-            candidates.append({"key": pub_key, "algo": "RS256"})
-        
-        # Prioritas 2: Secret Key (Fallback)
-        candidates.append({"key": settings.SECRET_KEY, "algo": "HS256"})
+_PRIV_KEY, _PUB_KEY, _ASYM_ALGO = None, None, "RS256"
+
+def reload_keys():
+    """
+    Baca ulang & parse key dari disk ke cache module scope.
+    Dipanggil sekali saat import, dan bisa dipanggil lagi setelah rotasi key.
+    """
+    global _PRIV_KEY, _PUB_KEY, _ASYM_ALGO
+    _PRIV_KEY, _PUB_KEY = _prepare_rsa_keys(*_load_rsa_keys())
+    # Algoritma asimetris mengikuti tipe key di file PEM:
+    # Ed25519 -> EdDSA (sign/verify jauh lebih cepat), selain itu RSA -> RS256
+    _ASYM_ALGO = "EdDSA" if isinstance(_PUB_KEY, ed25519.Ed25519PublicKey) else "RS256"
+
+reload_keys()
+
+def get_rsa_keys():
+    """
+    Return RSA Keys (sudah di-parse) yang di-cache di module scope.
+    Return: (private_key, public_key)
+    """
+    return _PRIV_KEY, _PUB_KEY
+
+def get_signing_key():
+    """
+    Return: (key, algo) untuk jwt.encode.
+    Hanya pakai key asimetris jika KEDUA kunci (Priv & Pub) ada, kalau tidak
+    Auth-nya gagal verifikasi. Fallback ke Secret Key (HS256).
+    """
+    if _PRIV_KEY and _PUB_KEY:
+        return _PRIV_KEY, _ASYM_ALGO
+    return settings.SECRET_KEY, "HS256"
+
+def get_verify_candidates():
+    """
+    Return: daftar (key, algo) untuk jwt.decode, urut prioritas.
+    Prioritas 1: RSA/EdDSA (hanya jika Public Key ada), Prioritas 2: Secret Key.
+    """
+    if _PUB_KEY:
+        return ((_PUB_KEY, _ASYM_ALGO), (settings.SECRET_KEY, "HS256"))
+    return ((settings.SECRET_KEY, "HS256"),)
+
+def get_token_candidates(token):
+    """
+    Pilih kandidat key berdasarkan 'alg' di header token (tanpa verifikasi),
+    supaya tidak mencoba decode RS256 dulu untuk token HS256 (atau sebaliknya).
+    Algoritma verifikasi tetap dikunci ke algo milik key, bukan dari header.
+    """
+    candidates = get_verify_candidates()
+    try:
+        alg = jwt.get_unverified_header(token).get("alg")
+    except jwt.InvalidTokenError:
+        return candidates
+    return tuple(c for c in candidates if c[1] == alg)
+
+def strip_bearer(token):
+    """Hapus prefix "Bearer " (besar/kecil) tanpa regex; hanya 7 char pertama yang di-lower."""
+    if token[:7].lower() == "bearer ":
+        token = token[7:]
+    return token.strip()
 
-        # 3. Coba Decode
-        for opt in candidates:
+# TTL cache hasil verifikasi token (detik), dibatasi juga oleh exp token
+AUTH_TOKEN_CACHE_TTL = 30
+
+class CustomJwtAuth(HttpBearer):
+    def authenticate(self, request, token):
+        # 1. Bersihkan Header "Bearer " (kalau client mengirim prefix dobel)
+        token = strip_bearer(token)
+
+        # 2. Token yang sama baru saja diverifikasi? Pakai hasilnya.
+        #    Yang disimpan hanya hash token, bukan token mentah.
+        token_key = "jwt:" + hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+        user_id = cache.get(token_key)
+        if user_id is None:
+            payload = self.verify_access_token(token)
+            if payload is None:
+                return None
+            user_id = payload.get("user_id")
+            ttl = min(int(payload.get("exp", 0) - time.time()), AUTH_TOKEN_CACHE_TTL)
+            if ttl > 0:
+                cache.set(token_key, user_id, ttl)
+
+        # 3. Cukup pastikan user masih ada (di-cache, di-invalidate via signal).
+        #    Endpoint hanya butuh user.id, jadi kembalikan instance User "deferred":
+        #    hanya pk yang terisi, kolom lain di-load dari DB saat pertama diakses.
+        user_exists = cache.get_or_set(
+            auth_user_cache_key(user_id),
+            lambda: User.objects.filter(pk=user_id).exists(),
+            AUTH_USER_CACHE_TTL,
+        )
+        if not user_exists:
+            return None
+        return User.from_db(None, ["id"], [user_id])
+
+    def verify_access_token(self, token):
+        # Coba Decode dengan kandidat key (sudah di-parse saat import)
+        for key, algo in get_token_candidates(token):
             try:
-                payload = jwt.decode(token, opt["key"], algorithms=[opt["algo"]])
+                payload = jwt.decode(token, key, algorithms=[algo])
                 if payload.get("type") == "access":
-                    user_id = payload.get("user_id")
-                    return User.objects.get(pk=user_id)
+                    return payload
             except Exception as e:
-                # Uncomment baris ini untuk melihat error di terminal Railway/Docker
-                # print(f"[AUTH FAIL] Algo: {opt['algo']} | Error: {e}")
+                # Aktifkan level DEBUG logger "core.apiv2" untuk melihat error ini
+                log.debug("[AUTH FAIL] Algo: %s | Error: %s", algo, e)
                 continue 
         
         return None
@@ -79,10 +185,14 @@ apiAuth = CustomJwtAuth()
 # ==========================================
 # 2. NINJA API INSTANCE
 # ==========================================
+# Satu instance throttle untuk seluruh modul (state rate-limit tidak terduplikasi)
+_THROTTLE = SimpleRateThrottle()
+
 api_v2 = NinjaAPI(
     title="SimpleLMS API v2",
     version="2.0.0",
-    throttle=SimpleRateThrottle(),
+    throttle=_THROTTLE,
+    renderer=ORJSONRenderer(),
     urls_namespace="api_v2"
 )
 
@@ -126,84 +236,229 @@ class RefreshResponseSchema(Schema):
 # ==========================================
 # 4. PAGINATION
 # ==========================================
+# Batas pagination: OFFSET besar = DB scan lalu buang baris (pakai cursor untuk scroll dalam)
+MAX_LIMIT = 100
+MAX_SKIP = 100_000
+
 class CustomPagination(PaginationBase):
     class Input(Schema):
-        skip: int = 0
-        limit: int = 5
+        skip: int = Field(0, ge=0, le=MAX_SKIP)
+        limit: int = Field(5, ge=1, le=MAX_LIMIT)
     class Output(Schema):
+        # Placeholder: @paginate membuat schema Paged<Item> dengan items: List[<response schema>]
         items: List[Any]
         total: int
+        # True -> COUNT berhenti di COUNT_CAP; total hanya batas bawah
+        total_capped: bool = False
         per_page: int
+        has_more: bool = False
+    def paginate_queryset(self, queryset, pagination: Input, **params):
+        skip, limit = pagination.skip, pagination.limit
+        items, total, total_capped, has_more = self.slice_with_total(queryset, skip, limit)
+        return {"items": items, "total": total, "total_capped": total_capped,
+                "per_page": limit, "has_more": has_more}
+
+    @staticmethod
+    def slice_with_total(queryset, skip, limit):
+        """
+        Ambil limit+1 baris dulu. Kalau halaman ini yang terakhir,
+        total = skip + jumlah baris (tanpa COUNT). Selain itu pakai cached_count.
+        Return: (items, total, total_capped, has_more)
+        """
+        items = list(queryset[skip : skip + limit + 1])
+        has_more = len(items) > limit
+        if not has_more and (items or skip == 0):
+            return items, skip + len(items), False, has_more
+        if isinstance(queryset, list):
+            return items[:limit], len(queryset), False, has_more
+        total, total_capped = cached_count(queryset)
+        if has_more:
+            # Baris sampai skip + len(items) terbukti ada, walau COUNT berhenti di COUNT_CAP
+            total = max(total, skip + len(items))
+        return items[:limit], total, total_capped, has_more
+
+COUNT_CACHE_TTL = 30
+# COUNT kecil murah & harus akurat -> hanya cache total >= COUNT_CACHE_MIN
+COUNT_CACHE_MIN = 1000
+# COUNT berhenti di sini; total >= COUNT_CAP hanya batas bawah dari total sebenarnya
+COUNT_CAP = 20000
+
+def cached_count(queryset):
+    """
+    COUNT(*) di-cache berdasarkan hash SQL query-nya.
+    Hanya total >= COUNT_CACHE_MIN yang di-cache; total itu boleh telat
+    maksimal COUNT_CACHE_TTL detik. Total dibatasi COUNT_CAP.
+    Return: (total, total_capped) -- total_capped True kalau COUNT mentok di COUNT_CAP.
+    """
+    sql, sql_params = queryset.query.sql_with_params()
+    key = "cnt:" + hashlib.md5(f"{sql}|{sql_params!r}".encode()).hexdigest()
+    total = cache.get(key)
+    if total is None:
+        # Tanpa ORDER BY & hanya pk -> bisa index-only scan, berhenti di COUNT_CAP
+        total = queryset.order_by().values("pk")[:COUNT_CAP].count()
+        if total >= COUNT_CACHE_MIN:
+            cache.set(key, total, COUNT_CACHE_TTL)
+    return total, total >= COUNT_CAP
+
+class CursorPagination(CustomPagination):
+    """
+    Pagination keyset untuk queryset dengan urutan apa pun (mis. name,id).
+    cursor = base64 dari nilai kolom urutan baris terakhir; halaman berikutnya
+    pakai WHERE (kolom...) > (nilai...) sehingga biaya tidak tergantung OFFSET.
+    Tanpa cursor tetap jalan seperti skip/limit biasa; queryset tanpa
+    order_by diurutkan by id.
+    """
+    class Input(CustomPagination.Input):
+        cursor: Optional[str] = None
+    class Output(CustomPagination.Output):
+        next_cursor: Optional[str] = None
     def paginate_queryset(self, queryset, pagination: Input, **params):
         skip, limit = pagination.skip, pagination.limit
-        total = queryset.count() if not isinstance(queryset, list) else len(queryset)
-        return {"items": queryset[skip : skip + limit], "total": total, "per_page": limit}
+        ordering = tuple(queryset.query.order_by) or ("id",)
+        queryset = queryset.order_by(*ordering)
+        if pagination.cursor:
+            total, total_capped = cached_count(queryset)
+            after = self.decode_cursor(pagination.cursor, len(ordering))
+            try:
+                queryset = queryset.filter(self.after_filter(ordering, after))
+            except (TypeError, ValueError):
+                # Cursor dari sort lain / nilai tidak cocok tipe kolom
+                raise HttpError(400, "Cursor tidak valid")
+            items = list(queryset[:limit + 1])
+            has_more = len(items) > limit
+            items = items[:limit]
+        else:
+            items, total, total_capped, has_more = self.slice_with_total(queryset, skip, limit)
+        next_cursor = None
+        if has_more and items:
+            next_cursor = self.encode_cursor(items[-1], ordering)
+        return {"items": items, "total": total, "total_capped": total_capped, "per_page": limit,
+                "has_more": has_more, "next_cursor": next_cursor}
+
+    @staticmethod
+    def encode_cursor(row, ordering):
+        names = [field.lstrip("-") for field in ordering]
+        values = [row[n] if isinstance(row, dict) else getattr(row, n) for n in names]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor, size):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError:
+            raise HttpError(400, "Cursor tidak valid")
+        if not isinstance(values, list) or len(values) != size:
+            raise HttpError(400, "Cursor tidak valid")
+        return values
+
+    @staticmethod
+    def after_filter(ordering, values):
+        """
+        (a, b) > (x, y)  ==  a > x OR (a = x AND b > y); arah per kolom
+        mengikuti ordering ('-' -> lt).
+        """
+        condition = Q()
+        for i in reversed(range(len(ordering))):
+            name = ordering[i].lstrip("-")
+            op = "lt" if ordering[i].startswith("-") else "gt"
+            step = Q(**{f"{name}__{op}": values[i]})
+            if i < len(ordering) - 1:
+                step |= Q(**{name: values[i]}) & condition
+            condition = step
+        return condition
 
 # ==========================================
 # 5. HELPER: CREATE TOKEN (FIXED LOGIC)
 # ==========================================
-def create_token_simple(user_id, type="access", exp_days=1):
-    priv_key, pub_key = get_rsa_keys()
-    
-    # FIX PENTING: Hanya pakai RSA jika KEDUA kunci (Priv & Pub) ada!
-    # Kalau cuma punya Private tapi gak punya Public, nanti Auth-nya gagal.
-    if priv_key and pub_key:
-        key = priv_key
-        algo = "RS256"
-    else:
-        # Fallback ke Secret Key (Pasti aman karena Auth juga punya ini)
-        key = settings.SECRET_KEY
-        algo = "HS256"
+# Masa berlaku token (detik)
+ACCESS_TOKEN_TTL = 86400       # 1 hari
+REFRESH_TOKEN_TTL = 604800     # 7 hari
+
+def create_token_simple(user_id, type="access", ttl=ACCESS_TOKEN_TTL, now=None):
+    key, algo = get_signing_key()
     
+    # PyJWT menerima integer epoch untuk exp/iat, tidak perlu objek datetime
+    if now is None: now = int(time.time())
     payload = {
         "user_id": user_id,
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(days=exp_days),
+        "iat": now,
+        "exp": now + ttl,
         "type": type
     }
     
-    token = jwt.encode(payload, key, algorithm=algo)
-    if isinstance(token, bytes): token = token.decode('utf-8')
-    return token
+    # PyJWT >= 2.0 sudah return str
+    return jwt.encode(payload, key, algorithm=algo)
+
+def create_token_pair(user_id):
+    """Access + refresh token dengan satu timestamp. Return: (access, refresh)"""
+    now = int(time.time())
+    return (
+        create_token_simple(user_id, "access", ACCESS_TOKEN_TTL, now),
+        create_token_simple(user_id, "refresh", REFRESH_TOKEN_TTL, now),
+    )
 
 # ==========================================
 # 6. ENDPOINTS
 # ==========================================
 
 # --- AUTH ---
+# Deploy pakai gunicorn WSGI (lihat Dockerfile): view sync biasa. Versi async
+# hanya menambah hop event loop + thread pool per request tanpa konkurensi ekstra.
+# Login sukses di-cache sebentar supaya re-login beruntun tidak PBKDF2 ulang
+LOGIN_CACHE_TTL = 60
+
+def login_cache_key(username, password):
+    # Keyed hash (SECRET_KEY): password tidak pernah tersimpan mentah / hash cepat tanpa kunci
+    digest = hashlib.blake2b(f"{username}\0{password}".encode(),
+                             key=settings.SECRET_KEY.encode()[:64], digest_size=16)
+    return "login:" + digest.hexdigest()
+
+def authenticate_cached(username, password):
+    """
+    Return: user_id kalau username/password valid, selain itu None.
+    Cache hit hanya dipakai kalau hash password user di DB belum berubah
+    dan user masih aktif (satu SELECT ringan, bukan PBKDF2).
+    """
+    key = login_cache_key(username, password)
+    hit = cache.get(key)
+    if hit:
+        user_id, password_hash = hit
+        if User.objects.filter(pk=user_id, password=password_hash, is_active=True).exists():
+            return user_id
+    user = authenticate(username=username, password=password)
+    if not user:
+        return None
+    cache.set(key, (user.id, user.password), LOGIN_CACHE_TTL)
+    return user.id
+
 @api_v2.post("/auth/sign-in", response=LoginResponseSchema, auth=None)
 def mobile_sign_in(request, data: MobileSignInSchema):
-    user = authenticate(username=data.username, password=data.password)
-    if not user:
+    user_id = authenticate_cached(data.username, data.password)
+    if not user_id:
         raise HttpError(401, "Username atau password salah")
     
-    access = create_token_simple(user.id, "access", 1)
-    refresh = create_token_simple(user.id, "refresh", 7)
+    access, refresh = create_token_pair(user_id)
     
     return {"access": access, "refresh": refresh}
 
-@api_v2.post("/auth/token-refresh", response=RefreshResponseSchema, auth=None)
-def mobile_token_refresh(request, data: MobileRefreshSchema):
-    token = re.sub(r'^bearer\s+', '', data.refresh, flags=re.IGNORECASE).strip()
-    
-    # Cek Validitas Refresh Token
-    _, pub_key = get_rsa_keys()
-    candidates = []
-    if pub_key: candidates.append({"key": pub_key, "algo": "RS256"})
-    candidates.append({"key": settings.SECRET_KEY, "algo": "HS256"})
-
-    user_id = None
-    for opt in candidates:
+def verify_refresh_token(token):
+    """Return: user_id kalau refresh token valid, selain itu None."""
+    for key, algo in get_token_candidates(token):
         try:
-            payload = jwt.decode(token, opt["key"], algorithms=[opt["algo"]])
+            payload = jwt.decode(token, key, algorithms=[algo])
             if payload.get("type") == "refresh":
-                user_id = payload.get("user_id")
-                break
-        except: pass
+                return payload.get("user_id")
+        except Exception as e:
+            log.debug("[REFRESH FAIL] Algo: %s | Error: %s", algo, e)
+    return None
 
+@api_v2.post("/auth/token-refresh", response=RefreshResponseSchema, auth=None)
+def mobile_token_refresh(request, data: MobileRefreshSchema):
+    user_id = verify_refresh_token(strip_bearer(data.refresh))
     if not user_id:
         raise HttpError(401, "Refresh token tidak valid")
 
-    new_access = create_token_simple(user_id, "access", 1)
+    new_access = create_token_simple(user_id, "access", ACCESS_TOKEN_TTL)
     return {"access": new_access}
 
 # --- BUSINESS ENDPOINTS ---
@@ -211,7 +466,8 @@ def mobile_token_refresh(request, data: MobileRefreshSchema):
 @api_v2.get("/users", response=List[UserOut])
 @paginate(CustomPagination)
 def list_users(request, search: Optional[str] = None):
-    qs = User.objects.all()
+    # Hanya kolom UserOut: hash password, last_login, dll. tidak ikut diambil
+    qs = User.objects.values("id", "username", "email")
     if search: qs = qs.filter(username__icontains=search)
     return qs
 
@@ -221,72 +477,123 @@ def my_courses(request):
     user = request.auth
     if not user: raise HttpError(401, "Unauthorized")
     
-    qs = CourseMember.objects.filter(user_id=user).select_related("course_id")
-    results = []
-    for member in qs:
-        results.append({
-            "id": member.id,
-            "user_id": user.id,            
-            "course_id": member.course_id.id 
-        })
-    return results
+    # FK user_id/course_id sudah berupa integer di tabel, tidak perlu JOIN
+    qs = CourseMember.objects.filter(user_id=user).values("id", "user_id", "course_id")
+    return qs
 
 @api_v2.post("/course/{id}/enroll/", response=CourseMemberOut, auth=apiAuth)
 def enroll_course(request, id: int):
     user = request.auth
     if not user: raise HttpError(401, "Unauthorized")
 
-    try:
-        course_obj = Course.objects.get(pk=id)
-    except Course.DoesNotExist:
+    # Cek course lewat EXISTS (index pk, tanpa ambil baris). FK Django itu
+    # DEFERRABLE INITIALLY DEFERRED: kalau view jalan di dalam atomic block luar
+    # (mis. TestCase), pelanggaran FK baru muncul saat commit, bukan di INSERT.
+    if not Course.objects.filter(pk=id).exists():
         raise HttpError(404, "Course tidak ditemukan")
-
-    if CourseMember.objects.filter(user_id=user, course_id=course_obj).exists():
+    # Langsung INSERT; duplikat (termasuk race) ditolak unique_course_member
+    try:
+        with transaction.atomic():
+            enrollment = CourseMember.objects.create(user_id=user, course_id_id=id)
+    except IntegrityError:
         raise HttpError(400, "Kamu sudah terdaftar di course ini!")
 
-    enrollment = CourseMember.objects.create(user_id=user, course_id=course_obj)
-    return {"id": enrollment.id, "user_id": user.id, "course_id": course_obj.id}
+    return {"id": enrollment.id, "user_id": user.id, "course_id": id}
+
+# Komentar identik dari user yang sama di konten yang sama dalam jendela ini ditolak
+DUP_COMMENT_WINDOW = 60
 
 @api_v2.post("/comments/", response=SuccessOut, auth=apiAuth) 
 def post_comment(request, data: CommentIn):
     user = request.auth
     if not user: raise HttpError(401, "Unauthorized")
 
-    try:
-        content = CourseContent.objects.get(pk=data.content_id)
-    except CourseContent.DoesNotExist:
+    # Dua query: EXISTS duplikat (lewat comment_content_id_idx) lalu INSERT di bawah.
+    # Bukan aturan permanen, hanya anti double-submit dalam DUP_COMMENT_WINDOW.
+    recent_dup = Comment.objects.filter(
+        content_id_id=data.content_id, member_id__user_id=user, comment=data.comment,
+        created_at__gte=timezone.now() - timedelta(seconds=DUP_COMMENT_WINDOW),
+    ).exists()
+    if recent_dup:
         return {"success": False, "comment_id": None}
 
-    member_qs = CourseMember.objects.filter(user_id=user, course_id=content.course_id)
-    if not member_qs.exists():
+    # INSERT ... VALUES (..., (SELECT member)): member dicari lewat JOIN konten.
+    # Konten tidak ada / user belum terdaftar -> subquery NULL -> NOT NULL gagal.
+    member_subq = CourseMember.objects.filter(
+        user_id=user, course_id__coursecontent__id=data.content_id
+    ).values("id")[:1]
+    try:
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                comment=data.comment, 
+                member_id_id=Subquery(member_subq), 
+                content_id_id=data.content_id
+            )
+    except IntegrityError:
         return {"success": False, "comment_id": None}
-
-    comment = Comment.objects.create(
-        comment=data.comment, 
-        member_id=member_qs.first(), 
-        content_id=content
-    )
     return {"success": True, "comment_id": comment.id}
 
 @api_v2.get("/content/{id}/comments/", response=List[CommentOut])
-@paginate(CustomPagination)
+@paginate(CursorPagination)
 def list_comments(request, id: int):
-    qs = Comment.objects.filter(content_id=id).select_related("member_id__user_id")
-    results = []
-    for item in qs:
-        results.append({
-            "id": item.id,
-            "comment": item.comment,
-            "user_id": item.member_id.user_id.id, 
-            "content_id": id
-        })
-    return results
+    # values() -> dict langsung dari SQL, paginate yang slice di level query
+    qs = Comment.objects.filter(content_id=id).values(
+        "id", "comment", "content_id", user_id=F("member_id__user_id")
+    )
+    return qs
+
+# Parameter sort -> argumen order_by (prefix "-" untuk descending).
+# id sebagai tie-breaker supaya urutan stabil & cocok dengan index (name, id) / (price, id)
+COURSE_SORT_FIELDS = {
+    "id": ("id",), "-id": ("-id",),
+    "name": ("name", "id"), "-name": ("-name", "-id"),
+    "price": ("price", "id"), "-price": ("-price", "-id"),
+}
+
+def course_list_state():
+    # (MAX(updated_at), COUNT) tabel course, di-cache & di-invalidate via signal Course
+    return cache.get_or_set(
+        COURSE_STATE_CACHE_KEY,
+        lambda: tuple(Course.objects.aggregate(last=Max("updated_at"), n=Count("id")).values()),
+        COURSE_STATE_CACHE_TTL,
+    )
+
+def course_list_etag(view):
+    """
+    Conditional GET untuk listing course. ETag = hash (MAX(updated_at), COUNT,
+    query string): berubah kalau ada course dibuat/diubah/dihapus atau
+    parameter beda. If-None-Match cocok -> 304 tanpa menjalankan listing.
+    Aggregate-nya di-cache (COURSE_STATE_CACHE_TTL) supaya tidak full scan tiap request.
+    Catatan: QuerySet.update() tidak mengisi auto_now (updated_at) dan tidak
+    memicu signal, jadi perubahan lewat update() tidak mengubah ETag. Jalur
+    seperti itu harus set updated_at sendiri lalu cache.delete(COURSE_STATE_CACHE_KEY).
+    """
+    @wraps(view)
+    def wrapper(request, **kwargs):
+        last, n = course_list_state()
+        query = sorted(request.GET.items())
+        digest = hashlib.blake2b(f"{last}:{n}:{query!r}".encode(), digest_size=16)
+        etag = f'"{digest.hexdigest()}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            not_modified = HttpResponse(status=304)
+            not_modified["ETag"] = etag
+            return not_modified
+        kwargs["response"]["ETag"] = etag
+        return view(request, **kwargs)
+    return wrapper
 
 @api_v2.get("/courses", response=List[CourseSchema])
-@paginate(CustomPagination)
-def list_courses(request, search: str = Query(None), price: str = Query(None), sort: str = Query("id")):
-    queryset = Course.objects.all()
+@course_list_etag
+@paginate(CursorPagination)
+def list_courses(request, response: HttpResponse, search: str = Query(None), price: str = Query(None), sort: str = Query("id")):
+    # Ambil kolom yang dipakai CourseSchema saja
+    queryset = Course.objects.only("id", "name", "description", "price")
     if search: queryset = queryset.filter(name__icontains=search)
-    if price: queryset = queryset.filter(price__iexact=price)
-    if sort in ["id", "name", "price"]: queryset = queryset.order_by(sort)
+    if price:
+        try:
+            queryset = queryset.filter(price=int(price))
+        except (TypeError, ValueError):
+            pass
+    ordering = COURSE_SORT_FIELDS.get(sort)
+    if ordering: queryset = queryset.order_by(*ordering)
     return queryset
\ No newline at end of file
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import migrations
+
+# Django menerjemahkan __icontains di PostgreSQL jadi UPPER(col::text) LIKE UPPER(%s),
+# jadi index trigram dibuat di atas ekspresi yang sama supaya planner bisa memakainya.
+TRGM_INDEXES = [
+    ("user_uname_trgm", "auth_user", "username"),
+    ("course_name_trgm", "core_course", "name"),
+]
+
+
+def create_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for name, table, column in TRGM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops);'
+        )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in TRGM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name};")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_members(apps, schema_editor):
+    # Check-then-create lama (dan admin) bisa membuat enrollment ganda.
+    # Per (user, course) simpan id terkecil, pindahkan komentar dari duplikat
+    # ke sana (FK komentar CASCADE), baru hapus duplikatnya.
+    CourseMember = apps.get_model('core', 'CourseMember')
+    Comment = apps.get_model('core', 'Comment')
+    if schema_editor.connection.vendor == "postgresql":
+        # FK Django DEFERRABLE: tanpa ini ALTER TABLE di bawah gagal karena
+        # "pending trigger events" dari UPDATE/DELETE di transaksi yang sama.
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE;")
+    groups = CourseMember.objects.values('user_id', 'course_id') \
+        .annotate(keep=Min('id'), n=Count('id')).filter(n__gt=1)
+    for group in groups:
+        dups = CourseMember.objects.filter(
+            user_id=group['user_id'], course_id=group['course_id']
+        ).exclude(id=group['keep'])
+        Comment.objects.filter(member_id__in=dups).update(member_id=group['keep'])
+        dups.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_comment_content_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_members, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='coursemember',
+            constraint=models.UniqueConstraint(fields=('user_id', 'course_id'), name='unique_course_member'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# courseMemberStat memfilter description__contains='python' -> "description"::text LIKE '%python%'.
+# Case-sensitive (tanpa UPPER), jadi index trigram cukup di atas kolomnya langsung.
+INDEX_NAME = "course_desc_trgm"
+
+
+def create_desc_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON core_course '
+        f'USING gin ("description" gin_trgm_ops);'
+    )
+
+
+def drop_desc_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME};")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_course_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_desc_trgm_index, drop_desc_trgm_index),
+    ]
@@ -14,6 +14,10 @@ class Course(models.Model):
     class Meta:
         verbose_name = "Mata Kuliah"
         verbose_name_plural = "Mata Kuliah"
+        indexes = [
+            models.Index(fields=["name", "id"], name="course_name_id_idx"),
+            models.Index(fields=["price", "id"], name="course_price_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name+" : "+str(self.price)
@@ -31,6 +35,9 @@ class CourseMember(models.Model):
     class Meta:
         verbose_name = "Subscriber Matkul"
         verbose_name_plural = "Subscriber Matkul"
+        constraints = [
+            models.UniqueConstraint(fields=["user_id", "course_id"], name="unique_course_member"),
+        ]
 
     def __str__(self) -> str:
         return str(self.course_id)+" : "+str(self.user_id)
@@ -64,6 +71,9 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "Komentar"
         verbose_name_plural = "Komentar"
+        indexes = [
+            models.Index(fields=["content_id", "id"], name="comment_content_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return "Komen: "+self.content_id.name+"-"+self.member_id.user_id.username
\ No newline at end of file
@@ -0,0 +1,11 @@
+import orjson
+from ninja.renderers import BaseRenderer
+from ninja.responses import NinjaJSONEncoder
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    # Tipe yang tidak dikenal orjson (Decimal, dll) dilempar ke encoder bawaan Ninja
+    _fallback = NinjaJSONEncoder()
+
+    def render(self, request, data, *, response_status):
+        return orjson.dumps(data, default=self._fallback.default)
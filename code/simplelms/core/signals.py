@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import User, Course
+
+# TTL cache status "user masih ada" untuk auth JWT (detik)
+AUTH_USER_CACHE_TTL = 30
+
+def auth_user_cache_key(user_id):
+    return f"u:{user_id}"
+
+# Cache (MAX(updated_at), COUNT) tabel course untuk ETag listing (detik)
+COURSE_STATE_CACHE_KEY = "courses:state"
+COURSE_STATE_CACHE_TTL = 30
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user_cache(sender, instance, **kwargs):
+    # Password/status berubah -> buang cache supaya auth baca ulang dari DB
+    cache.delete(auth_user_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_state_cache(sender, instance, **kwargs):
+    # Course dibuat/diubah/dihapus lewat model -> ETag listing langsung berubah
+    cache.delete(COURSE_STATE_CACHE_KEY)
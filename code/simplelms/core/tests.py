@@ -2,7 +2,9 @@ from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from .models import Course, CourseMember, CourseContent, Comment
 import json
+from datetime import timedelta
 from django.test import override_settings
+from django.utils import timezone
 
 @override_settings(TESTING=True)
 class SimpleLMSCompleteTest(TestCase):
@@ -51,6 +53,11 @@ class SimpleLMSCompleteTest(TestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+    def test_enroll_missing_course(self):
+        response = self.client.post('/api/v2/course/99999/enroll/', **self.auth_headers)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(CourseMember.objects.filter(course_id_id=99999).exists())
+
     def test_post_comment_success(self):
         CourseMember.objects.create(user_id=self.student, course_id=self.course)
         data = {"comment": "Mantap", "content_id": self.content.id}
@@ -64,4 +71,239 @@ class SimpleLMSCompleteTest(TestCase):
 
     def test_pagination_structure(self):
         response = self.client.get('/api/v2/courses')
-        self.assertIn('items', response.json())
\ No newline at end of file
+        self.assertIn('items', response.json())
+
+    def test_filter_courses_by_price(self):
+        Course.objects.create(name="Django Basic", price=100000, teacher=self.teacher)
+        response = self.client.get('/api/v2/courses', {'price': '100000'})
+        self.assertEqual(response.status_code, 200)
+        names = [item['name'] for item in response.json()['items']]
+        self.assertEqual(names, ["Django Basic"])
+
+    def test_list_comments_and_my_courses_fields(self):
+        member = CourseMember.objects.create(user_id=self.student, course_id=self.course)
+        comment = Comment.objects.create(content_id=self.content, member_id=member, comment="Keren")
+
+        response = self.client.get(f'/api/v2/content/{self.content.id}/comments/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['items'], [{
+            "id": comment.id, "comment": "Keren",
+            "user_id": self.student.id, "content_id": self.content.id,
+        }])
+
+        response = self.client.get('/api/v2/mycourses/', **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['items'], [{
+            "id": member.id, "user_id": self.student.id, "course_id": self.course.id,
+        }])
+
+    def test_register_rejects_password_without_digit(self):
+        data = {"username": "pendaftar", "password": "hanyahuruf", "email": "a@b.c",
+                "first_name": "Pen", "last_name": "Daftar"}
+        response = self.client.post('/api/v1/register/', data=json.dumps(data),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(User.objects.filter(username="pendaftar").exists())
+
+    def test_list_comments_keyset_pagination(self):
+        member = CourseMember.objects.create(user_id=self.student, course_id=self.course)
+        comments = [
+            Comment.objects.create(content_id=self.content, member_id=member, comment=f"Komen {i}")
+            for i in range(3)
+        ]
+        url = f'/api/v2/content/{self.content.id}/comments/'
+
+        first = self.client.get(url, {'limit': 2}).json()
+        self.assertEqual([c['id'] for c in first['items']], [comments[0].id, comments[1].id])
+        self.assertIsNotNone(first['next_cursor'])
+
+        second = self.client.get(url, {'limit': 2, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([c['id'] for c in second['items']], [comments[2].id])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_post_comment_not_enrolled(self):
+        data = {"comment": "Mantap", "content_id": self.content.id}
+        response = self.client.post(
+            '/api/v2/comments/', 
+            data=json.dumps(data), 
+            content_type="application/json", 
+            **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"success": False, "comment_id": None})
+        self.assertFalse(Comment.objects.exists())
+
+    def test_pagination_rejects_out_of_range_limit(self):
+        response = self.client.get('/api/v2/courses', {'limit': 1000})
+        self.assertEqual(response.status_code, 422)
+        response = self.client.get('/api/v2/courses', {'skip': -1})
+        self.assertEqual(response.status_code, 422)
+
+    def test_post_comment_duplicate_rejected(self):
+        CourseMember.objects.create(user_id=self.student, course_id=self.course)
+        data = json.dumps({"comment": "Spam", "content_id": self.content.id})
+        first = self.client.post('/api/v2/comments/', data=data,
+                                 content_type="application/json", **self.auth_headers)
+        second = self.client.post('/api/v2/comments/', data=data,
+                                  content_type="application/json", **self.auth_headers)
+        self.assertTrue(first.json()['success'])
+        self.assertFalse(second.json()['success'])
+        self.assertEqual(Comment.objects.count(), 1)
+
+        # Di luar jendela waktu komentar yang sama boleh dikirim lagi
+        Comment.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        third = self.client.post('/api/v2/comments/', data=data,
+                                 content_type="application/json", **self.auth_headers)
+        self.assertTrue(third.json()['success'])
+
+    def test_token_refresh(self):
+        response = self.client.post(
+            '/api/v2/auth/sign-in',
+            data=json.dumps({"username": "murid_uji", "password": "password123"}),
+            content_type="application/json"
+        )
+        refresh = response.json()['refresh']
+        response = self.client.post('/api/v2/auth/token-refresh', data=json.dumps({"refresh": refresh}),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+
+        # Access token tidak boleh dipakai sebagai refresh token
+        response = self.client.post('/api/v2/auth/token-refresh', data=json.dumps({"refresh": self.token}),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_sign_in_after_password_change(self):
+        self.student.set_password('password-baru1')
+        self.student.save()
+        # setUp sudah login dengan password lama; cache login tidak boleh dipakai lagi
+        response = self.client.post(
+            '/api/v2/auth/sign-in',
+            data=json.dumps({"username": "murid_uji", "password": "password123"}),
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_home_stats(self):
+        User.objects.create_superuser(username='admin_uji', password='password123')
+        CourseMember.objects.create(user_id=self.student, course_id=self.course)
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        # Superuser tidak dihitung sebagai user
+        self.assertEqual(response.context['stats'], {'users': 2, 'courses': 1, 'members': 1, 'content': 1})
+
+    def test_course_stat(self):
+        cheap = Course.objects.create(name="Python Dasar", price=100000, teacher=self.teacher)
+        CourseMember.objects.create(user_id=self.student, course_id=self.course)
+        data = self.client.get('/core/stats-courses/').json()
+        self.assertEqual(data['course_count'], 2)
+        self.assertEqual(data['courses'], {'max_price': 500000, 'min_price': 100000, 'avg_price': 300000.0})
+        self.assertEqual(data['cheapest'], [{'id': cheap.id, 'name': "Python Dasar", 'price': 100000, 'member_count': 0}])
+        self.assertEqual(data['popular'][0]['id'], self.course.id)
+        self.assertEqual(data['unpopular'][0]['id'], cheap.id)
+
+    def test_all_course_streaming(self):
+        response = self.client.get('/core/all-course/')
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data, [{
+            'id': self.course.id, 'name': "Django Advanced", 'description': '-', 'price': 500000,
+            'teacher': {'id': self.teacher.id, 'username': 'dosen_uji', 'email': '', 'fullName': ' '},
+        }])
+
+    def test_list_courses_cursor_pagination(self):
+        for name in ["Basis Data", "Algoritma", "Basis Data"]:
+            Course.objects.create(name=name, price=100000, teacher=self.teacher)
+        expected = list(Course.objects.order_by("name", "id").values_list("id", flat=True))
+
+        seen, cursor = [], None
+        while True:
+            params = {'sort': 'name', 'limit': 2}
+            if cursor: params['cursor'] = cursor
+            data = self.client.get('/api/v2/courses', params).json()
+            self.assertEqual(data['total'], 4)
+            seen += [item['id'] for item in data['items']]
+            cursor = data['next_cursor']
+            if not cursor: break
+        self.assertEqual(seen, expected)
+
+        for bad in ['bukan-cursor', 'WyJhYmMiXQ==']:
+            response = self.client.get('/api/v2/courses', {'cursor': bad})
+            self.assertEqual(response.status_code, 400)
+
+    def test_list_courses_etag(self):
+        response = self.client.get('/api/v2/courses', {'sort': 'name'})
+        etag = response['ETag']
+        response = self.client.get('/api/v2/courses', {'sort': 'name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Parameter lain / data berubah -> ETag baru
+        response = self.client.get('/api/v2/courses', {'sort': 'price'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        Course.objects.create(name="Kursus Baru", price=1000, teacher=self.teacher)
+        response = self.client.get('/api/v2/courses', {'sort': 'name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total'], 2)
+
+    def test_course_detail_counts(self):
+        member = CourseMember.objects.create(user_id=self.student, course_id=self.course)
+        CourseMember.objects.create(user_id=self.teacher, course_id=self.course)
+        content2 = CourseContent.objects.create(course_id=self.course, name="Video Tutorial 2")
+        for text in ["a", "b", "c"]:
+            Comment.objects.create(content_id=content2, member_id=member, comment=text)
+
+        data = self.client.get(f'/core/course-detail/{self.course.id}/').json()
+        self.assertEqual(data['member_count'], 2)
+        self.assertEqual(data['content_count'], 2)
+        self.assertEqual(data['comment_stat']['comment_count'], 3)
+        self.assertEqual(data['comment_stat']['most_comment'][0], {'name': "Video Tutorial 2", 'comment_count': 3})
+        self.assertEqual(data['teacher']['fullname'], ' ')
+
+    def test_member_stats_page(self):
+        from django.core.cache import cache
+        cache.delete('stats:members')
+        CourseMember.objects.create(user_id=self.student, course_id=self.course)
+        CourseMember.objects.create(user_id=self.teacher, course_id=self.course, roles='ast')
+        response = self.client.get('/core/api-data/stats-members/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_members'], 2)
+        # Dalam TTL angka diambil dari cache, member baru belum terhitung
+        CourseMember.objects.create(user_id=self.student, course_id=Course.objects.create(name="Lain", teacher=self.teacher))
+        response = self.client.get('/core/api-data/stats-members/')
+        self.assertEqual(response.context['total_members'], 2)
+
+    def test_list_users(self):
+        response = self.client.get('/api/v2/users', {'search': 'murid'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['items'], [{'id': self.student.id, 'username': 'murid_uji', 'email': ''}])
+
+    def test_user_courses_streaming(self):
+        # View memakai user pk=3 (hardcoded); di PostgreSQL pk itu bisa saja user dari setUp
+        owner, _ = User.objects.get_or_create(pk=3, defaults={'username': 'dosen_tiga', 'first_name': 'Tiga'})
+        Course.objects.create(name="Kursus Tiga", price=1000, teacher=owner)
+        response = self.client.get('/core/user-courses/')
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data['username'], owner.username)
+        self.assertEqual(data['fullName'], f"{owner.first_name} {owner.last_name}")
+        self.assertEqual([c['name'] for c in data['courses']], ["Kursus Tiga"])
+
+    def test_calc(self):
+        response = self.client.post('/api/v1/calc', data=json.dumps({"nil1": 6, "nil2": 7, "opr": "x"}),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['hasil'], 42)
+
+    def test_pagination_total_capped(self):
+        from unittest import mock
+        from django.core.cache import cache
+        for i in range(9):
+            Course.objects.create(name=f"Kursus {i}", price=1000, teacher=self.teacher)
+        cache.clear()
+        with mock.patch('core.apiv2.COUNT_CAP', 3):
+            data = self.client.get('/api/v2/courses', {'skip': 5, 'limit': 2}).json()
+        # COUNT mentok di 3, tapi baris sampai skip + limit + 1 terbukti ada
+        self.assertTrue(data['has_more'])
+        self.assertTrue(data['total_capped'])
+        self.assertEqual(data['total'], 8)
+        data = self.client.get('/api/v2/courses', {'skip': 5, 'limit': 2}).json()
+        self.assertFalse(data['total_capped'])
+        self.assertEqual(data['total'], 10)
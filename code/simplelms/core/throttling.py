@@ -1,4 +1,6 @@
 from ninja.throttling import BaseThrottle
+from collections import OrderedDict, deque
+import threading
 import time
 import sys
 from django.conf import settings
@@ -6,20 +8,29 @@ from django.conf import settings
 class SimpleRateThrottle(BaseThrottle):
     rate = 10
     duration = 60
-    cache = {}
+    # LRU per IP: IP paling lama tidak aktif dibuang kalau melebihi MAX_IPS
+    MAX_IPS = 10_000
+    cache = OrderedDict()
+    lock = threading.Lock()
 
     def allow_request(self, request):
         if 'test' in sys.argv or getattr(settings, 'TESTING', False):
             return True
-            
+
         ip = request.META.get("REMOTE_ADDR", "unknown")
-        now = time.time()
-        history = self.cache.get(ip, [])
-        history = [req for req in history if req > now - self.duration]
-        
-        if len(history) >= self.rate:
-            return False
-            
-        history.append(now)
-        self.cache[ip] = history
-        return True
\ No newline at end of file
+        now = time.monotonic()
+        with self.lock:
+            history = self.cache.get(ip)
+            if history is None:
+                # deque(maxlen=rate): timestamp tertua otomatis tergeser, cek O(1)
+                history = self.cache[ip] = deque(maxlen=self.rate)
+                if len(self.cache) > self.MAX_IPS:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(ip)
+
+            if len(history) == self.rate and history[0] > now - self.duration:
+                return False
+
+            history.append(now)
+            return True
@@ -1,10 +1,18 @@
-from django.http import JsonResponse,HttpResponse
+from django.http import JsonResponse,HttpResponse,StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+import json
 from django.contrib.auth.models import User
-from django.db.models import Max, Min, Avg, Count
-from .models import Course, CourseContent, CourseMember  
-from django.core import serializers
+from django.db.models import Max, Min, Avg, Count, CharField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+from .models import Course, CourseContent, CourseMember, Comment  
 from django.core.exceptions import ObjectDoesNotExist
 from django.shortcuts import render
+from django.db import connection
+from django.core.cache import cache
+
+def _full_name(prefix=''):
+    # "first last" dirangkai di SQL, bukan f-string per baris di Python
+    return Concat(f'{prefix}first_name', Value(' '), f'{prefix}last_name', output_field=CharField())
 
 def api_all_courses(request):
     courses = Course.objects.select_related('teacher').all()
@@ -14,7 +22,10 @@ def api_user_courses(request):
     members = CourseMember.objects.select_related('user_id', 'course_id').all()
     return render(request, 'user_courses.html', {'members': members})
 
-def api_course_stats(request):
+# Angka statistik boleh telat sebentar; burst request cukup 1 query per TTL
+STATS_CACHE_TTL = 30
+
+def _course_stats():
     stats = Course.objects.aggregate(
         total_courses=Count('id'),
         avg_price=Avg('price'),
@@ -24,17 +35,23 @@ def api_course_stats(request):
     
     if stats['avg_price'] is not None:
         stats['avg_price'] = int(stats['avg_price'])
+    return stats
 
+def api_course_stats(request):
+    stats = cache.get_or_set('stats:courses', _course_stats, STATS_CACHE_TTL)
     return render(request, 'stats_courses.html', {'stats': stats})
 
-def api_member_stats(request):
-    total_members = CourseMember.objects.count()
-    role_stats = CourseMember.objects.values('roles').annotate(total=Count('id'))
-    
-    return render(request, 'stats_members.html', {
-        'total_members': total_members,
+def _member_stats():
+    role_stats = list(CourseMember.objects.values('roles').annotate(total=Count('id')))
+    # Total = jumlah per role, tidak perlu COUNT terpisah
+    return {
+        'total_members': sum(role['total'] for role in role_stats),
         'role_stats': role_stats
-    })
+    }
+
+def api_member_stats(request):
+    context = cache.get_or_set('stats:members', _member_stats, STATS_CACHE_TTL)
+    return render(request, 'stats_members.html', context)
 
 def index_courses(request):
     return render(request, 'courses.html')
@@ -66,80 +83,96 @@ def create_course_from_query(request):
     )
     return JsonResponse({"id": course.id, "name": course.name})
 
+def _json_array(rows):
+    # Generator JSON array: baris di-encode satu per satu, tidak ditumpuk di memori
+    yield '['
+    for i, row in enumerate(rows):
+        if i:
+            yield ', '
+        yield json.dumps(row, cls=DjangoJSONEncoder)
+    yield ']'
+
 def allCourse(request):
-    allCourse = Course.objects.all()
-    result = []
-    for course in allCourse:
-        record = {
-            'id': course.id, 
-            'name': course.name,
-            'description': course.description,
-            'price': course.price,
-            'teacher': {
-                'id': course.teacher.id,
-                'username': course.teacher.username,
-                'email': course.teacher.email,
-                'fullName': f"{course.teacher.first_name} {course.teacher.last_name}"
-            }
+    rows = Course.objects.annotate(teacher_full=_full_name('teacher__')).values(
+        'id', 'name', 'description', 'price',
+        'teacher__id', 'teacher__username', 'teacher__email', 'teacher_full',
+    ).iterator(chunk_size=500)
+    records = ({
+        'id': row['id'], 
+        'name': row['name'],
+        'description': row['description'],
+        'price': row['price'],
+        'teacher': {
+            'id': row['teacher__id'],
+            'username': row['teacher__username'],
+            'email': row['teacher__email'],
+            'fullName': row['teacher_full']
         }
-        result.append(record)
-    return JsonResponse(result, safe=False)
+    } for row in rows)
+    return StreamingHttpResponse(_json_array(records), content_type='application/json')
 
 def userCourses(request):
-    user = User.objects.get(pk=3)
-    courses = Course.objects.filter(teacher=user.id)
-    
-    course_data = []
-    for course in courses:
-        record = {
-            'id': course.id, 
-            'name': course.name,
-            'description': course.description, 
-            'price': course.price
-        }
-        course_data.append(record)
+    user = User.objects.annotate(full_name=_full_name()).get(pk=3)
+    courses = Course.objects.filter(teacher=user.id) \
+        .values('id', 'name', 'description', 'price').iterator(chunk_size=500)
         
-    result = {
+    fields = {
         'id': user.id, 
         'username': user.username, 
         'email': user.email,
-        'fullName': f"{user.first_name} {user.last_name}",
-        'courses': course_data
+        'fullName': user.full_name,
     }
+
+    def stream():
+        # Objek user ditulis per key, lalu array courses hasil streaming sebagai key terakhir
+        yield '{'
+        for key, value in fields.items():
+            yield f'{json.dumps(key)}: {json.dumps(value, cls=DjangoJSONEncoder)}, '
+        yield '"courses": '
+        yield from _json_array(courses)
+        yield '}'
     
-    return JsonResponse(result, safe=False)
+    return StreamingHttpResponse(stream(), content_type='application/json')
 
 def courseStat(request):
-    courses = Course.objects.all()
-    stats = courses.aggregate(max_price=Max('price'),
-                              min_price=Min('price'),
-                              avg_price=Avg('price'))
-    
-    cheapest = Course.objects.filter(price=stats['min_price'])
-    expensive = Course.objects.filter(price=stats['max_price'])
-    
-    popular = Course.objects.annotate(member_count=Count('coursemember')) \
-        .order_by('-member_count')[:5]
-        
-    unpopular = Course.objects.annotate(member_count=Count('coursemember')) \
-        .order_by('member_count')[:5]
+    # Satu query: semua course + jumlah member; statistik & top-5 dihitung di Python
+    courses = list(Course.objects.annotate(member_count=Count('coursemember')) \
+        .order_by('id').values('id', 'name', 'price', 'member_count'))
+    prices = [course['price'] for course in courses]
+    stats = {
+        'max_price': max(prices, default=None),
+        'min_price': min(prices, default=None),
+        'avg_price': sum(prices) / len(prices) if prices else None,
+    }
+
+    popular = sorted(courses, key=lambda course: course['member_count'], reverse=True)[:5]
+    unpopular = sorted(courses, key=lambda course: course['member_count'])[:5]
     
     result = {
         'course_count': len(courses), 
         'courses': stats,
-        'cheapest': serializers.serialize('python', cheapest),
-        'expensive': serializers.serialize('python', expensive),
-        'popular': serializers.serialize('python', popular),
-        'unpopular': serializers.serialize('python', unpopular)
+        'cheapest': [course for course in courses if course['price'] == stats['min_price']],
+        'expensive': [course for course in courses if course['price'] == stats['max_price']],
+        'popular': popular,
+        'unpopular': unpopular
     }
     
     return JsonResponse(result, safe=False)
 
+def _count_per_course(queryset, course_field):
+    # COUNT(*) per course sebagai scalar subquery (NULL -> 0)
+    counts = queryset.filter(**{course_field: OuterRef('pk')}).order_by() \
+        .values(course_field).annotate(total=Count('*')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
 def courseDetail(request, course_id):
-    course = Course.objects.annotate(
-        member_count=Count('coursemember'),
-        content_count=Count('coursecontent'),
-        comment_count=Count('coursecontent__comment')
+    # Tiga COUNT terpisah sebagai subquery: tidak ada JOIN member x konten x komentar
+    # yang saling mengalikan baris (dan membuat angkanya salah).
+    course = Course.objects.select_related('teacher').annotate(
+        teacher_full=_full_name('teacher__'),
+        member_count=_count_per_course(CourseMember.objects, 'course_id'),
+        content_count=_count_per_course(CourseContent.objects, 'course_id'),
+        comment_count=_count_per_course(Comment.objects, 'content_id__course_id')
     ).get(pk=course_id)
 
     contents = CourseContent.objects.filter(course_id=course.id) \
@@ -155,7 +188,7 @@ def courseDetail(request, course_id):
         'teacher': {
             'username': course.teacher.username,
             'email': course.teacher.email,
-            'fullname': f"{course.teacher.first_name} {course.teacher.last_name}"
+            'fullname': course.teacher_full
         },
         'comment_stat': {
             'comment_count': course.comment_count,
@@ -171,14 +204,10 @@ def courseDetail(request, course_id):
     return JsonResponse(result)
 
 def courseMemberStat(request):
-    courses = Course.objects.filter(description__contains='python') \
-        .annotate(member_num=Count('coursemember'))
-    
-    course_data = []
-    for course in courses:
-        record = {'id': course.id, 'name': course.name, 'price': course.price,
-                  'member_count': course.member_num}
-        course_data.append(record)
+    # values() langsung jadi dict, tanpa instansiasi Course per baris
+    course_data = list(Course.objects.filter(description__contains='python') \
+        .annotate(member_count=Count('coursemember')) \
+        .values('id', 'name', 'price', 'member_count'))
         
     result = {'data_count': len(course_data), 'data': course_data}
     return JsonResponse(result)
@@ -187,10 +216,16 @@ def home(request):
     courses = Course.objects.all().select_related('teacher') \
         .annotate(member_count=Count('coursemember__user_id'))
     
-    total_users = User.objects.filter(is_superuser=False).count()
-    total_courses = Course.objects.count()
-    total_members = CourseMember.objects.count()
-    total_content = CourseContent.objects.count()
+    # Empat COUNT dalam satu round-trip (scalar subquery), bukan empat query terpisah
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT (SELECT COUNT(*) FROM {User._meta.db_table} WHERE is_superuser = %s), "
+            f"(SELECT COUNT(*) FROM {Course._meta.db_table}), "
+            f"(SELECT COUNT(*) FROM {CourseMember._meta.db_table}), "
+            f"(SELECT COUNT(*) FROM {CourseContent._meta.db_table})",
+            [False],
+        )
+        total_users, total_courses, total_members, total_content = cursor.fetchone()
     
     context = {
         'title': 'SimpleLMS - Platform Belajar Masa Kini',
@@ -2,8 +2,8 @@
 
 import os
 import csv
+from concurrent.futures import ThreadPoolExecutor
 from django.db import connection 
-from django.core.exceptions import ObjectDoesNotExist 
 
 # --- SETUP DJANGO HARUS PALING ATAS ---
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'simplelms.settings') 
@@ -12,10 +12,13 @@ django.setup()
 # --- END SETUP ---
 
 from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
 from core.models import Course, CourseMember 
 
 # Path folder CSV di dalam kontainer
 CSV_DIR = '../csv_data/'
+# Jumlah baris per INSERT untuk bulk_create
+BATCH_SIZE = 500
 
 # --- FUNGSI HELPER UNTUK RESET SEQUENCE ---
 def reset_db_sequences():
@@ -35,29 +38,47 @@ def reset_db_sequences():
 # --- 1. IMPORT USER DATA (Memaksa PK) ---
 print("--- 1. Importing User Data ---")
 with open(os.path.join(CSV_DIR, 'user-data.csv'), mode='r') as csvfile:
-    reader = csv.DictReader(csvfile)
-    
-    for row in reader:
+    user_rows = []
+    for row in csv.DictReader(csvfile):
         try:
-            user_id_from_csv = int(row['id']) # Wajib ada kolom 'id' di CSV
+            row['id'] = int(row['id']) # Wajib ada kolom 'id' di CSV
         except (ValueError, KeyError):
             print(f"SKIP: User {row.get('username', 'Unknown')} missing 'id' or invalid value.")
             continue
-            
-        if not User.objects.filter(pk=user_id_from_csv).exists():
-            
-            # Gunakan .create() untuk memasukkan ID manual
-            user = User.objects.create(
-                id=user_id_from_csv, 
-                username=row['username'],
-                email=row['email'], 
-                is_staff=True, 
-                is_active=True,
-            )
-            # Hash password secara manual 
-            user.set_password(row['password'])
-            user.save() 
-            print(f"Imported User: {row['username']} (PK: {user.pk})")
+        user_rows.append(row)
+
+# Satu query untuk cek PK yang sudah ada, bukan exists() per baris
+existing_ids = set(User.objects.filter(pk__in=[row['id'] for row in user_rows]).values_list('pk', flat=True))
+new_users = []
+for row in user_rows:
+    # PK yang sudah ada di DB atau muncul dua kali di CSV: hanya baris pertama yang dipakai
+    if row['id'] not in existing_ids:
+        existing_ids.add(row['id'])
+        new_users.append(row)
+
+# PBKDF2 berat di CPU; hashlib melepas GIL, jadi thread cukup untuk paralel
+with ThreadPoolExecutor() as executor:
+    hashes = list(executor.map(make_password, [row['password'] for row in new_users]))
+
+User.objects.bulk_create([
+    User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        password=password_hash,
+        is_staff=True,
+        is_active=True,
+    )
+    for row, password_hash in zip(new_users, hashes)
+], batch_size=BATCH_SIZE, ignore_conflicts=True)
+# ignore_conflicts melewati baris bentrok (mis. username sudah dipakai) tanpa error,
+# jadi cek ulang PK mana yang benar-benar masuk
+inserted_ids = set(User.objects.filter(pk__in=[row['id'] for row in new_users]).values_list('pk', flat=True))
+for row in new_users:
+    if row['id'] in inserted_ids:
+        print(f"Imported User: {row['username']} (PK: {row['id']})")
+    else:
+        print(f"SKIP: User {row['username']} (PK: {row['id']}) conflicts with an existing user.")
 
 # Reset sequence setelah import User selesai
 reset_db_sequences()
@@ -66,50 +87,63 @@ reset_db_sequences()
 # --- 2. IMPORT COURSE DATA ---
 print("\n--- 2. Importing Course Data ---")
 with open(os.path.join(CSV_DIR, 'course-data.csv'), mode='r') as csvfile:
-    reader = csv.DictReader(csvfile)
-    for row in reader:
-        if not Course.objects.filter(name=row['name']).exists():
-            
-            try:
-                # Pencarian berdasarkan PK User
-                teacher_user = User.objects.get(pk=int(row['teacher']))
-            except (ObjectDoesNotExist, ValueError):
-                print(f"ERROR: Teacher ID {row['teacher']} not found or invalid. Skipping course {row['name']}.")
-                continue
-            
-            Course.objects.create(
-                name=row['name'],
-                description=row['description'],
-                price=int(row['price']), 
-                teacher=teacher_user
-            )
-            print(f"Imported Course: {row['name']}")
+    course_rows = list(csv.DictReader(csvfile))
+
+existing_names = set(Course.objects.filter(name__in=[row['name'] for row in course_rows]).values_list('name', flat=True))
+teacher_ids = set(User.objects.values_list('pk', flat=True))
+
+new_courses = []
+for row in course_rows:
+    if row['name'] in existing_names:
+        continue
+    try:
+        teacher_id = int(row['teacher'])
+    except ValueError:
+        teacher_id = None
+    if teacher_id not in teacher_ids:
+        print(f"ERROR: Teacher ID {row['teacher']} not found or invalid. Skipping course {row['name']}.")
+        continue
+    existing_names.add(row['name'])
+    new_courses.append(Course(
+        name=row['name'],
+        description=row['description'],
+        price=int(row['price']), 
+        teacher_id=teacher_id
+    ))
+
+Course.objects.bulk_create(new_courses, batch_size=BATCH_SIZE)
+for course in new_courses:
+    print(f"Imported Course: {course.name}")
 
 
 # --- 3. IMPORT MEMBER DATA (Koreksi Field Relasi) ---
 print("\n--- 3. Importing Member Data ---")
 with open(os.path.join(CSV_DIR, 'member-data.csv'), mode='r') as csvfile:
-    reader = csv.DictReader(csvfile)
-    for row in reader:
-        
-        course_id_str = row['course_id']
-        user_id_str = row['user_id']
+    member_rows = list(csv.DictReader(csvfile))
 
-        try:
-            course = Course.objects.get(pk=int(course_id_str))
-            user = User.objects.get(pk=int(user_id_str))
-            
-        except ValueError:
-            print(f"ERROR: ID Member tidak valid (Non-numeric): Course ID {course_id_str} or User ID {user_id_str}. Skipping.")
-            continue
-        except (Course.DoesNotExist, User.DoesNotExist):
-            print(f"ERROR: Course ID {course_id_str} or User ID {user_id_str} not found in DB. Skipping member entry.")
-            continue
-            
-        if not CourseMember.objects.filter(course_id=course, user_id=user).exists():
-            CourseMember.objects.create(
-                course_id=course,
-                user_id=user,
-                roles=row['roles']
-            )
-            print(f"Imported Member: User {user.username} to Course {course.name}")
\ No newline at end of file
+course_names = dict(Course.objects.values_list('pk', 'name'))
+usernames = dict(User.objects.values_list('pk', 'username'))
+existing_pairs = set(CourseMember.objects.values_list('course_id', 'user_id'))
+
+new_members = []
+for row in member_rows:
+    course_id_str = row['course_id']
+    user_id_str = row['user_id']
+
+    try:
+        course_id, user_id = int(course_id_str), int(user_id_str)
+    except ValueError:
+        print(f"ERROR: ID Member tidak valid (Non-numeric): Course ID {course_id_str} or User ID {user_id_str}. Skipping.")
+        continue
+    if course_id not in course_names or user_id not in usernames:
+        print(f"ERROR: Course ID {course_id_str} or User ID {user_id_str} not found in DB. Skipping member entry.")
+        continue
+
+    if (course_id, user_id) not in existing_pairs:
+        existing_pairs.add((course_id, user_id))
+        new_members.append(CourseMember(course_id_id=course_id, user_id_id=user_id, roles=row['roles']))
+
+# ignore_conflicts: unique_course_member tetap jadi pengaman kalau ada import paralel
+CourseMember.objects.bulk_create(new_members, batch_size=BATCH_SIZE, ignore_conflicts=True)
+for member in new_members:
+    print(f"Imported Member: User {usernames[member.user_id_id]} to Course {course_names[member.course_id_id]}")
@@ -89,7 +89,12 @@ DATABASES = {
 
 database_url = os.environ.get("DATABASE_URL")
 if database_url:
-    DATABASES["default"] = dj_database_url.parse(database_url)
+    # Koneksi persisten: hindari handshake TCP/TLS/auth Postgres di setiap request
+    DATABASES["default"] = dj_database_url.parse(
+        database_url,
+        conn_max_age=int(os.environ.get("DJANGO_MAX_CONN_AGE", 600)),
+        conn_health_checks=True,
+    )
 
 
 # Password validation